@@ -1,27 +1,56 @@
 import pytest
 import os
-import multiprocessing
-import json
-from utils.device_manager import DeviceManager
-from utils.yaml_utils import load_yaml
-from utils.screenshot_util import screenshot_util
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from utils.yaml_utils import _devices_by_id
 from utils.logger import log
-from datetime import datetime
-import re
 
-# 全局队列用于收集测试结果
-test_results_queue = multiprocessing.Queue()
+# DeviceManager (uiautomator2), screenshot_util and ReportUtil are imported where they are
+# used, so starting pytest or an xdist worker does not pay for the uiautomator2 import graph
 
+# 统一测试报告，仅在 --combined-report 时由主进程创建
+_report_util = None
+
+# 每个设备的 DeviceManager 只创建并连接一次，在会话结束时统一断开
+_device_managers = {}
+
+# pytest-html 的附件构造函数，只解析一次；未安装 pytest-html 时为 None
+try:
+    from pytest_html import extras as _html_extras
+    _html_extras_html = _html_extras.html
+except ImportError:
+    _html_extras_html = None
+
+@functools.lru_cache(maxsize=1)
 def get_device_ids():
     """
     Get list of device IDs from the configuration
     
+    Uses the same device index as get_device_config, so both agree on
+    which entries are configured. The tuple is built once per process,
+    as this is called for every collected test function.
+    
+    Returns:
+        tuple: Device IDs
+    """
+    return tuple(_devices_by_id())
+
+def get_worker_device_id():
+    """
+    Get the device ID the current pytest-xdist worker is pinned to
+    
+    Workers are mapped to devices by their number (gw0 -> first device,
+    gw1 -> second device, ...), wrapping around if there are more workers
+    than devices. Without xdist the first device is used.
+    
     Returns:
-        list: List of device IDs
+        str: Device ID
     """
-    devices_path = os.path.join(os.path.dirname(__file__), 'config', 'devices.yaml')
-    devices_data = load_yaml(devices_path)
-    return [device.get('id') for device in devices_data.get('devices', [])]
+    device_ids = get_device_ids()
+    worker_id = os.environ.get("PYTEST_XDIST_WORKER", "master")
+    if worker_id == "master":
+        return device_ids[0]
+    return device_ids[int(worker_id.replace("gw", "")) % len(device_ids)]
 
 def pytest_addoption(parser):
     """
@@ -29,55 +58,174 @@ def pytest_addoption(parser):
     """
     parser.addoption("--device-id", action="store", default=None,
                      help="Specify a device ID from the config to run tests on")
+    parser.addoption("--combined-report", action="store_true", default=False,
+                     help="Record results of all devices to reports/results.json as tests finish "
+                          "and generate a combined HTML report at the end")
+    parser.addoption("--device-per-worker", action="store_true", default=False,
+                     help="Run every test once, pinning each pytest-xdist worker to one device, "
+                          "instead of running every test on all devices")
     # pytest-rerunfailures 插件已经添加了 --reruns 和 --reruns-delay 选项，不需要重复添加
 
+def pytest_configure(config):
+    """
+    Create the combined report on the controlling process only
+    
+    Under pytest-xdist the workers forward their test reports to the
+    controlling process, which is then the single writer of the results.
+    """
+    global _report_util
+    if config.getoption("--combined-report") and not hasattr(config, "workerinput"):
+        from utils.report_util import ReportUtil
+        _report_util = ReportUtil(" ".join(config.args))
+    else:
+        _report_util = None
+
 def pytest_generate_tests(metafunc):
     """
     Generate test parameters
     """
-    # If a test requires a device_id parameter, parametrize it with available device IDs
+    # If a test requires a device_id parameter, parametrize it with available device IDs.
+    # The values go through the session-scoped device_id fixture (indirect=True).
     if "device_id" in metafunc.fixturenames:
         # If specific device ID is provided via command line, use only that one
         specific_device_id = metafunc.config.getoption("--device-id")
         if specific_device_id:
-            metafunc.parametrize("device_id", [specific_device_id])
+            metafunc.parametrize("device_id", [specific_device_id], indirect=True)
+        elif not metafunc.config.getoption("--device-per-worker"):
+            # Otherwise, use all available device IDs.
+            # With --device-per-worker the device_id fixture picks the worker's device instead.
+            metafunc.parametrize("device_id", get_device_ids(), indirect=True)
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(items):
+    """
+    Group parametrized tests by device for pytest-xdist
+
+    With --dist=loadgroup all tests sharing a device_id are sent to the same
+    worker, so every worker drives exactly one device.
+    """
+    for item in items:
+        callspec = getattr(item, "callspec", None)
+        device_id = callspec.params.get("device_id") if callspec else None
+        if device_id is not None:
+            item.add_marker(pytest.mark.xdist_group(device_id))
+        elif "device_id" in item.fixturenames:
+            # --device-per-worker: the test runs on the worker's device, no group is needed
+            device_id = get_worker_device_id()
         else:
-            # Otherwise, use all available device IDs
-            metafunc.parametrize("device_id", get_device_ids())
+            continue
+        # 记录到报告中，xdist会随测试报告一起传回主进程
+        item.user_properties.append(("device_id", device_id))
 
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="session")
 def device_id(request):
     """
     Fixture to provide device ID
+    
+    Parametrized tests get the device ID as parameter. With --device-per-worker
+    the ID of the device this xdist worker is pinned to is returned.
+    """
+    if hasattr(request, "param"):
+        return request.param
+    return get_worker_device_id()
+
+@pytest.fixture(scope="session")
+def _device_session(device_id):
+    """
+    Fixture to provide a device connection shared by all tests of a device
+    
+    The DeviceManager is cached per device ID for the whole session, so it
+    is not reconnected when pytest switches between device parameters.
+    Connections are closed in pytest_sessionfinish.
+    
+    Args:
+        device_id: The device ID to connect to
+        
+    Returns:
+        tuple: (DeviceManager, uiautomator2.Device)
     """
-    return request.param
+    device_manager = _device_managers.get(device_id) or _connect_device(device_id)
+    return device_manager, device_manager.device
+
+def _connect_device(device_id):
+    """
+    Connect to a device and cache its DeviceManager for the session
+    
+    Args:
+        device_id: The device ID to connect to
+        
+    Returns:
+        DeviceManager: The connected device manager
+    """
+    from utils.device_manager import DeviceManager
+    
+    log.info(f"连接设备 device_id={device_id}")
+    device_manager = DeviceManager(device_id)
+    device_manager.connect()
+    _device_managers[device_id] = device_manager
+    return device_manager
+
+def _try_connect_device(device_id):
+    """
+    Connect to a device ahead of its tests, leaving errors to the fixture
+    """
+    try:
+        _connect_device(device_id)
+    except Exception as e:
+        log.warning(f"预先连接设备失败 device_id={device_id}: {str(e)}")
 
 @pytest.fixture(scope="function")
-def device(device_id, request):
+def device(_device_session, device_id):
     """
-    Fixture to provide a connected device
+    Fixture to provide a connected device with a freshly started app
     
     Args:
+        _device_session: The shared device connection
         device_id: The device ID to connect to
         
-    Yields:
+    Returns:
         uiautomator2.Device: Connected device object
     """
     log.info(f"设置 device_id={device_id} 的测试环境")
+    device_manager, device = _device_session
     
-    # Initialize and connect device
-    device_manager = DeviceManager(device_id)
-    device = device_manager.connect()
+    # Start the application. "am start -S" force-stops the previous run of the app in the same
+    # shell call, so no separate stop is needed after the test; the app is stopped on disconnect.
+    device_manager.start_app()
+    
+    # Provide the device for the test
+    return device
+
+@pytest.fixture(scope="class")
+def logged_in_device(_device_session, device_id):
+    """
+    Fixture to provide a device already logged in with the valid user
+    
+    The app is started and logged in once per test class, and all tests of
+    the class continue from that state instead of logging in again.
+    
+    Args:
+        _device_session: The shared device connection
+        device_id: The device ID to connect to
+        
+    Returns:
+        uiautomator2.Device: Connected and logged in device object
+    """
+    from pages.login_page import LoginPage
+    from utils.yaml_utils import get_account_credentials
     
-    # Start the application
+    log.info(f"登录 device_id={device_id}，供整个测试类复用")
+    device_manager, device = _device_session
     device_manager.start_app()
     
-    # Yield the device for the test
-    yield device
+    credentials = get_account_credentials('valid_user')
+    login_page = LoginPage(device)
+    login_page.login(credentials.get('username'), credentials.get('password'))
+    if not login_page.is_login_successful():
+        pytest.fail(f"Login failed on device {device_id}")
     
-    # Clean up after test
-    log.info(f"清理 device_id={device_id} 的测试环境")
-    device_manager.disconnect()
+    # The next start_app() restarts the app with "am start -S", no stop is needed afterwards
+    return device
 
 @pytest.hookimpl(tryfirst=True, hookwrapper=True)
 def pytest_runtest_makereport(item, call):
@@ -89,314 +237,83 @@ def pytest_runtest_makereport(item, call):
     if report.when == "call" and report.failed:
         try:
             # 获取device fixture
-            device = item.funcargs.get("device")
+            device = item.funcargs.get("device") or item.funcargs.get("logged_in_device")
             if device:
+                from utils.screenshot_util import screenshot_util
+                
                 log.error(f"测试失败: {item.nodeid}")
+                # 如果使用了pytest-html (--html)，等待截图写入完成后再添加到报告
+                attach_to_html = bool(_html_extras_html and item.config.getoption("htmlpath", None))
                 screenshot_path = screenshot_util.take_screenshot(
                     device, 
-                    item.nodeid
+                    item.nodeid,
+                    wait=attach_to_html
                 )
                 
-                # 如果使用了pytest-html，将截图添加到报告
-                if hasattr(item.config, "_html"):
-                    # 将截图作为额外附件添加到报告
-                    if screenshot_path and os.path.exists(screenshot_path):
+                if attach_to_html:
+                    # 将截图作为额外附件添加到报告，截图写入失败时不添加
+                    if screenshot_path:
                         html = '<div><img src="{}" alt="screenshot" style="width:600px;height:auto;" /></div>'.format(
                             screenshot_path
                         )
                         # 在附加HTML中添加图片
-                        extra = getattr(report, "extra", [])
-                        extra.append(pytest.html.extras.html(html))
-                        setattr(report, "extra", extra)
+                        extras = getattr(report, "extras", [])
+                        extras.append(_html_extras_html(html))
+                        setattr(report, "extras", extras)
         except Exception as e:
             log.error(f"测试失败后截图出错: {str(e)}")
 
-def run_test_on_device(device_id, test_module, results_queue):
+def pytest_runtest_logreport(report):
     """
-    Run tests on a specific device
-    
-    Args:
-        device_id (str): Device ID to run tests on
-        test_module (str): Test module to run
-        results_queue: 多进程队列，用于收集测试结果
+    Record each finished test in the combined report as soon as it completes
     """
-    log.info(f"开始在设备 {device_id} 上运行测试")
-    
-    # 为每个设备生成一个临时的JSON结果文件
-    temp_dir = os.path.join(os.path.dirname(__file__), 'temp')
-    os.makedirs(temp_dir, exist_ok=True)
-    json_result_file = os.path.join(temp_dir, f"results_{device_id}.json")
+    if _report_util is None:
+        return
     
-    # 执行测试，使用--json-report参数而不是--json
-    exit_code = pytest.main([
-        test_module,
-        f"--device-id={device_id}",
-        "-v",
-        "--json-report",
-        f"--json-report-file={json_result_file}",
-        "--reruns=2",        # 失败重试2次
-        "--reruns-delay=1"   # 重试间隔1秒
-    ])
+    # 只记录最终结果: 调用阶段的结果，以及在setup阶段就失败或跳过的用例
+    if report.when == "call":
+        outcome = report.outcome
+    elif report.when == "setup" and not report.passed:
+        outcome = "error" if report.failed else report.outcome
+    else:
+        return
     
-    # 将设备ID和结果文件路径放入队列
-    results_queue.put({
-        'device_id': device_id,
-        'result_file': json_result_file,
-        'exit_code': exit_code
-    })
+    # pytest-rerunfailures 的中间重试结果不记录
+    if outcome == "rerun":
+        return
     
-    log.info(f"设备 {device_id} 的测试完成，退出代码: {exit_code}")
+    device_id = dict(report.user_properties).get("device_id", "unknown")
+    _report_util.add_result(report.nodeid, device_id, outcome, report.duration)
 
-def run_tests_in_parallel(test_module):
+def pytest_collection_finish(session):
     """
-    Run tests in parallel on all available devices
+    Connect all devices used by the collected tests concurrently
     
-    Args:
-        test_module (str): Test module to run
+    Only done in a single-process run, where the devices would otherwise be
+    connected one after another. An xdist worker connects to its own device
+    when its first test needs it.
     """
-    device_ids = get_device_ids()
-    processes = []
-    
-    log.info(f"开始在 {len(device_ids)} 台设备上并行运行测试: {device_ids}")
-    
-    # 使用多进程队列收集结果
-    results_queue = multiprocessing.Queue()
-    
-    # 创建临时目录
-    temp_dir = os.path.join(os.path.dirname(__file__), 'temp')
-    os.makedirs(temp_dir, exist_ok=True)
-    
-    for device_id in device_ids:
-        process = multiprocessing.Process(
-            target=run_test_on_device,
-            args=(device_id, test_module, results_queue)
-        )
-        processes.append(process)
-        process.start()
-    
-    # 等待所有进程完成
-    for process in processes:
-        process.join()
+    config = session.config
+    if hasattr(config, "workerinput") or config.getoption("collectonly"):
+        return
     
-    log.info("所有设备测试进程已完成，正在生成统一测试报告...")
-    
-    # 从队列中收集所有设备的测试结果
-    all_results = []
-    while not results_queue.empty():
-        result = results_queue.get()
-        all_results.append(result)
-    
-    # 生成统一的HTML报告
-    generate_combined_report(all_results, test_module)
+    device_ids = {dict(item.user_properties)["device_id"]
+                  for item in session.items if "device_id" in dict(item.user_properties)}
+    if len(device_ids) > 1:
+        # adb 操作是I/O密集型，线程并行不受GIL限制
+        with ThreadPoolExecutor(max_workers=len(device_ids)) as executor:
+            list(executor.map(_try_connect_device, device_ids))
 
-def generate_combined_report(test_results, test_module):
-    """
-    生成包含所有设备测试结果的统一HTML报告
-    
-    Args:
-        test_results (list): 包含每个设备测试结果的列表
-        test_module (str): 测试模块名称
+def pytest_sessionfinish(session):
     """
-    # 创建报告目录
-    reports_dir = os.path.join(os.path.dirname(__file__), 'reports')
-    os.makedirs(reports_dir, exist_ok=True)
-    
-    # 生成报告文件名
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    report_file = os.path.join(reports_dir, f"combined_report_{timestamp}.html")
-    
-    # 创建HTML报告内容
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="utf-8">
-        <title>多设备测试报告</title>
-        <style>
-            body {{
-                font-family: Arial, sans-serif;
-                margin: 20px;
-                line-height: 1.6;
-            }}
-            h1 {{
-                color: #333;
-                border-bottom: 2px solid #eee;
-                padding-bottom: 10px;
-            }}
-            .device-section {{
-                margin-bottom: 30px;
-                border: 1px solid #ddd;
-                padding: 15px;
-                border-radius: 5px;
-            }}
-            .device-header {{
-                background-color: #f5f5f5;
-                padding: 10px;
-                margin: -15px -15px 15px -15px;
-                border-bottom: 1px solid #ddd;
-                border-radius: 5px 5px 0 0;
-            }}
-            .pass {{
-                color: green;
-            }}
-            .fail {{
-                color: red;
-            }}
-            .summary {{
-                margin-bottom: 20px;
-                font-size: 1.1em;
-            }}
-            table {{
-                width: 100%;
-                border-collapse: collapse;
-            }}
-            th, td {{
-                border: 1px solid #ddd;
-                padding: 8px;
-                text-align: left;
-            }}
-            th {{
-                background-color: #f2f2f2;
-            }}
-            tr:nth-child(even) {{
-                background-color: #f9f9f9;
-            }}
-        </style>
-    </head>
-    <body>
-        <h1>Android UI 自动化测试报告</h1>
-        <div class="summary">
-            <p>测试模块: <strong>{test_module}</strong></p>
-            <p>执行时间: <strong>{datetime.now().strftime("%Y-%m-%d %H:%M:%S")}</strong></p>
-            <p>测试设备数量: <strong>{len(test_results)}</strong></p>
-        </div>
+    Disconnect all devices and generate the combined HTML report at the end of the session
     """
+    if _device_managers:
+        log.info(f"断开设备: {list(_device_managers)}")
+        with ThreadPoolExecutor(max_workers=len(_device_managers)) as executor:
+            list(executor.map(lambda device_manager: device_manager.disconnect(),
+                              _device_managers.values()))
+        _device_managers.clear()
     
-    # 添加每个设备的测试结果
-    for result in test_results:
-        device_id = result['device_id']
-        result_file = result['result_file']
-        exit_code = result['exit_code']
-        
-        # 读取JSON结果文件
-        if os.path.exists(result_file):
-            try:
-                with open(result_file, 'r') as f:
-                    json_data = json.load(f)
-                
-                # 获取测试统计信息
-                summary = json_data.get('summary', {})
-                total = summary.get('total', 0)
-                passed = summary.get('passed', 0)
-                failed = summary.get('failed', 0)
-                skipped = summary.get('skipped', 0)
-                
-                # 添加设备测试结果到HTML
-                status_class = "pass" if exit_code == 0 else "fail"
-                
-                html_content += f"""
-                <div class="device-section">
-                    <div class="device-header">
-                        <h2>设备: {device_id}</h2>
-                        <p class="{status_class}">状态: {'通过' if exit_code == 0 else '失败'}</p>
-                    </div>
-                    <div class="device-summary">
-                        <p>总用例数: {total}</p>
-                        <p>通过: <span class="pass">{passed}</span></p>
-                        <p>失败: <span class="fail">{failed}</span></p>
-                        <p>跳过: {skipped}</p>
-                    </div>
-                """
-                
-                # 添加测试用例详情
-                tests = json_data.get('tests', [])
-                if tests:
-                    html_content += """
-                    <table>
-                        <tr>
-                            <th>测试用例</th>
-                            <th>结果</th>
-                            <th>耗时 (秒)</th>
-                        </tr>
-                    """
-                    
-                    for test in tests:
-                        name = test.get('name', '')
-                        nodeid = test.get('nodeid', '')
-                        # Extract just the test name from the nodeid for better readability
-                        if not name and nodeid:
-                            # Extract the test method name from the nodeid
-                            # From format like "tests/test_login.py::TestLogin::test_successful_login[device1]"
-                            # to just "test_successful_login"
-                            match = re.search(r'::([^:]+)(\[|$)', nodeid)
-                            if match:
-                                name = match.group(1)
-                            else:
-                                name = nodeid.split('::')[-1] if '::' in nodeid else nodeid
-                                
-                        outcome = test.get('outcome', '')
-                        
-                        # Get duration from the "call" section instead of top-level
-                        call_data = test.get('call', {})
-                        duration = call_data.get('duration', 0)
-                        
-                        outcome_class = "pass" if outcome == "passed" else "fail" if outcome == "failed" else ""
-                        outcome_text = "通过" if outcome == "passed" else "失败" if outcome == "failed" else "跳过"
-                        
-                        html_content += f"""
-                        <tr>
-                            <td>{name}</td>
-                            <td class="{outcome_class}">{outcome_text}</td>
-                            <td>{duration:.2f}</td>
-                        </tr>
-                        """
-                    
-                    html_content += "</table>"
-                
-                html_content += "</div>"  # 结束设备部分
-                
-            except Exception as e:
-                log.error(f"读取结果文件失败: {result_file}, 错误: {str(e)}")
-                html_content += f"""
-                <div class="device-section">
-                    <div class="device-header">
-                        <h2>设备: {device_id}</h2>
-                        <p class="fail">状态: 错误</p>
-                    </div>
-                    <p>无法读取测试结果: {str(e)}</p>
-                </div>
-                """
-        else:
-            log.error(f"结果文件不存在: {result_file}")
-            html_content += f"""
-            <div class="device-section">
-                <div class="device-header">
-                    <h2>设备: {device_id}</h2>
-                    <p class="fail">状态: 错误</p>
-                </div>
-                <p>未找到测试结果文件</p>
-            </div>
-            """
-    
-    # 完成HTML
-    html_content += """
-    </body>
-    </html>
-    """
-    
-    # 写入HTML文件
-    with open(report_file, 'w', encoding='utf-8') as f:
-        f.write(html_content)
-    
-    log.info(f"统一测试报告已生成: {report_file}")
-
-if __name__ == "__main__":
-    # This allows running tests in parallel directly by executing this file
-    import sys
-    
-    if len(sys.argv) > 1:
-        test_module = sys.argv[1]
-    else:
-        test_module = "tests/test_login.py"
-    
-    run_tests_in_parallel(test_module) 
\ No newline at end of file
+    if _report_util is not None:
+        _report_util.generate_html_report()
@@ -12,28 +12,34 @@ def retry(max_attempts=3, delay=1):
         delay: 重试间隔时间(秒)
     """
     def decorator(func):
+        # 只尝试一次时无需重试包装
+        if max_attempts <= 1:
+            return func
+        
+        # 获取函数名称用于日志记录
+        func_name = func.__name__
+        
         @wraps(func)
-        def wrapper(*args, self=None, **kwargs):
+        def wrapper(self, *args, **kwargs):
             last_exception = None
-            # 获取函数名称用于日志记录
-            func_name = func.__name__
             
             for attempt in range(1, max_attempts + 1):
                 try:
-                    log.info(f"执行 {func_name} (尝试 {attempt}/{max_attempts})")
-                    result = func(*args, **kwargs)
-                    return result
+                    # 首次尝试不记录日志，只记录重试
+                    if attempt > 1:
+                        log.info("执行 %s (尝试 %d/%d)", func_name, attempt, max_attempts)
+                    return func(self, *args, **kwargs)
                 except Exception as e:
                     last_exception = e
-                    log.warning(f"{func_name} 失败 (尝试 {attempt}/{max_attempts}): {str(e)}")
+                    log.warning("%s 失败 (尝试 %d/%d): %s", func_name, attempt, max_attempts, e)
                     
                     # 最后一次尝试失败后，不再等待
                     if attempt < max_attempts:
-                        log.info(f"等待 {delay} 秒后重试...")
+                        log.info("等待 %s 秒后重试...", delay)
                         time.sleep(delay)
             
             # 所有尝试都失败后，重新抛出最后一个异常
-            log.error(f"{func_name} 在 {max_attempts} 次尝试后失败: {str(last_exception)}")
+            log.error("%s 在 %d 次尝试后失败: %s", func_name, max_attempts, last_exception)
             raise last_exception
         return wrapper
     return decorator
@@ -51,13 +57,36 @@ class BasePage:
         """
         self.device = device
         self.timeout = 10
+        # UiObject cache, keyed by selector items
+        self._elements = {}
         log.info(f"初始化页面: {self.__class__.__name__}, 设备: {device.serial}")
     
-    @retry(max_attempts=3)
+    def get_element(self, selector):
+        """
+        Get the UiObject for a selector without waiting for it
+        
+        The UiObject is built once per page and selector. It is only a handle:
+        exists/wait/click query the device again on every call, so reusing it is safe.
+        
+        Args:
+            selector (dict): The selector of the element
+            
+        Returns:
+            uiautomator2.UiObject: The element handle
+        """
+        key = frozenset(selector.items())
+        element = self._elements.get(key)
+        if element is None:
+            element = self.device(**selector)
+            self._elements[key] = element
+        return element
+    
     def find_element(self, selector, timeout=None):
         """
         Find an element using a selector
         
+        Not retried: the wait itself already covers the whole timeout.
+        
         Args:
             selector (dict): The selector to find the element
             timeout (int, optional): Timeout in seconds
@@ -69,17 +98,12 @@ class BasePage:
             timeout = self.timeout
             
         log.info(f"查找元素: {selector}, 超时: {timeout}秒")
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            try:
-                element = self.device(**selector)
-                if element.exists:
-                    log.info(f"元素已找到: {selector}")
-                    return element
-            except Exception as e:
-                log.debug(f"查找元素时出错: {str(e)}")
-            time.sleep(0.5)
-            
+        # UiObject.wait blocks on the device side, so the lookup costs a single RPC
+        element = self.get_element(selector)
+        if element.wait(timeout=timeout):
+            log.info(f"元素已找到: {selector}")
+            return element
+
         # 元素未找到，记录错误并截图
         error_msg = f"元素未找到: {selector}, 超时: {timeout}秒"
         log.error(error_msg)
@@ -87,27 +111,31 @@ class BasePage:
         raise TimeoutError(error_msg)
     
     @retry(max_attempts=2)
-    def click_element(self, selector, timeout=None):
+    def click_element(self, selector, timeout=None, post_wait_selector=None):
         """
         Click an element using a selector
         
+        The click does not sleep afterwards. Callers should assert the state
+        they expect next, or pass post_wait_selector to wait for it here.
+        
         Args:
             selector (dict): The selector to find the element
             timeout (int, optional): Timeout in seconds
+            post_wait_selector (dict, optional): Selector of an element expected after the click
         """
         log.info(f"点击元素: {selector}")
         try:
             element = self.find_element(selector, timeout)
             element.click()
             log.info(f"元素点击成功: {selector}")
-            time.sleep(1)  # Wait for action to complete
+            self._wait_for_post_condition(post_wait_selector)
         except Exception as e:
             log.error(f"点击元素失败: {selector}, 错误: {str(e)}")
             screenshot_util.take_screenshot(self.device, f"click_failed_{self.__class__.__name__}")
             raise
     
     @retry(max_attempts=2)
-    def input_text(self, selector, text, timeout=None):
+    def input_text(self, selector, text, timeout=None, post_wait_selector=None):
         """
         Input text to an element
         
@@ -115,14 +143,15 @@ class BasePage:
             selector (dict): The selector to find the element
             text (str): Text to input
             timeout (int, optional): Timeout in seconds
+            post_wait_selector (dict, optional): Selector of an element expected after the input
         """
         log.info(f"输入文本到元素: {selector}, 文本: {text}")
         try:
             element = self.find_element(selector, timeout)
-            element.clear_text()
-            element.send_keys(text)
+            # set_text replaces the field content in one RPC, no separate clear_text is needed
+            element.set_text(text)
             log.info(f"文本输入成功: {selector}")
-            time.sleep(0.5)  # Wait for input to complete
+            self._wait_for_post_condition(post_wait_selector)
         except Exception as e:
             log.error(f"输入文本失败: {selector}, 文本: {text}, 错误: {str(e)}")
             screenshot_util.take_screenshot(self.device, f"input_failed_{self.__class__.__name__}")
@@ -160,6 +189,55 @@ class BasePage:
         self.find_element(selector, timeout)
         log.info(f"元素已出现: {selector}")
     
+    def wait_for(self, selector, timeout=None):
+        """
+        Wait for an element to appear, without failing if it does not
+        
+        Use this instead of a fixed sleep when the next screen is known.
+        
+        Args:
+            selector (dict): The selector of the element
+            timeout (int, optional): Timeout in seconds
+            
+        Returns:
+            bool: True if the element appeared within the timeout
+        """
+        if timeout is None:
+            timeout = self.timeout
+        log.info(f"等待元素: {selector}, 超时: {timeout}秒")
+        return self.get_element(selector).wait(exists=True, timeout=timeout)
+    
+    def wait_any(self, selectors, timeout=None):
+        """
+        Wait until any of several elements appears
+        
+        Useful when an action has more than one possible outcome, e.g. the
+        home page or an error message after login: whichever appears first
+        ends the wait, instead of waiting out the timeout for the other one.
+        
+        Args:
+            selectors (list): Selectors of the possible elements
+            timeout (int, optional): Timeout in seconds
+            
+        Returns:
+            dict: The selector that appeared first, or None on timeout
+        """
+        if timeout is None:
+            timeout = self.timeout
+        log.info(f"等待任一元素出现: {selectors}, 超时: {timeout}秒")
+        elements = [(selector, self.get_element(selector)) for selector in selectors]
+        deadline = time.time() + timeout
+        while True:
+            for selector, element in elements:
+                if element.exists:
+                    log.info(f"元素已出现: {selector}")
+                    return selector
+            if time.time() >= deadline:
+                break
+            time.sleep(0.1)
+        log.info(f"等待任一元素超时: {selectors}")
+        return None
+    
     def get_text(self, selector, timeout=None):
         """
         Get text from an element
@@ -182,11 +260,58 @@ class BasePage:
             screenshot_util.take_screenshot(self.device, f"get_text_failed_{self.__class__.__name__}")
             raise
         
-    def go_back(self):
+    def go_back(self, expected_activity=None, timeout=None, post_wait_selector=None):
         """
         Go back to the previous screen
+        
+        Args:
+            expected_activity (str, optional): Activity expected in the foreground afterwards,
+                either the full name or a suffix such as ".MainActivity"
+            timeout (int, optional): Timeout in seconds for expected_activity
+            post_wait_selector (dict, optional): Selector of an element expected on the previous screen
         """
         log.info("返回上一页")
         self.device.press("back")
-        time.sleep(1)
-        log.info("返回操作完成") 
\ No newline at end of file
+        if expected_activity:
+            self._wait_for_activity(expected_activity, timeout)
+        self._wait_for_post_condition(post_wait_selector)
+        log.info("返回操作完成")
+    
+    def _wait_for_activity(self, expected_activity, timeout=None):
+        """
+        Wait until the expected activity is in the foreground
+        
+        Args:
+            expected_activity (str): Full activity name (e.g. "com.swaglabsmobileapp.MainActivity")
+                or a suffix of it (e.g. ".MainActivity")
+            timeout (int, optional): Timeout in seconds
+            
+        Returns:
+            bool: True if the activity came to the foreground in time
+        """
+        deadline = time.time() + (timeout or self.timeout)
+        while time.time() < deadline:
+            try:
+                current = self.device.app_current()
+            except Exception:
+                # 界面切换过程中可能没有获得焦点的窗口，继续等待
+                current = {}
+            # dumpsys 通常返回简写的Activity (".MainActivity")，补全包名后再比较
+            activity = current.get("activity", "")
+            if activity.startswith("."):
+                activity = current.get("package", "") + activity
+            if activity and activity.endswith(expected_activity):
+                return True
+            time.sleep(0.1)
+        log.warning(f"等待Activity超时: {expected_activity}")
+        return False
+    
+    def _wait_for_post_condition(self, post_wait_selector):
+        """
+        Wait for the element expected after an action, instead of a fixed sleep
+        
+        Args:
+            post_wait_selector (dict, optional): Selector of the expected element, nothing is waited for if None
+        """
+        if post_wait_selector:
+            self.wait_for(post_wait_selector) 
\ No newline at end of file
@@ -1,5 +1,4 @@
 from pages.base_page import BasePage
-import time
 
 class HomePage(BasePage):
     """
@@ -55,11 +54,14 @@ class HomePage(BasePage):
     def logout(self):
         """
         Logout from the app
+        
+        Callers should then wait for the login screen, e.g. with
+        wait_for_element(LoginPage.USERNAME_FIELD).
         """
         self.open_menu()
-        time.sleep(1)
+        # Wait for the menu to slide in instead of a fixed sleep
+        self.wait_for_element(self.LOGOUT_BUTTON, timeout=5)
         self.click_element(self.LOGOUT_BUTTON)
-        time.sleep(2)
     
     def select_product(self, index=0):
         """
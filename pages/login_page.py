@@ -1,5 +1,4 @@
 from pages.base_page import BasePage
-import time
 
 class LoginPage(BasePage):
     """
@@ -28,8 +27,8 @@ class LoginPage(BasePage):
         Navigate to the login page from the main screen
         """
         # For the Swag Labs app, we are already on the login page when app starts
-        # So no navigation is needed
-        time.sleep(1)
+        # So no navigation is needed, only wait for the login form to be shown
+        self.wait_for(self.LOGIN_FORM, timeout=5)
     
     def enter_username(self, username):
         """
@@ -54,7 +53,8 @@ class LoginPage(BasePage):
         Click the login button
         """
         self.click_element(self.LOGIN_BUTTON)
-        time.sleep(2)  # Wait for login process
+        # No fixed wait for the login process: is_login_successful() and
+        # get_error_message() wait for the resulting screen
     
     def login(self, username, password):
         """
@@ -76,8 +76,9 @@ class LoginPage(BasePage):
         Returns:
             bool: True if login was successful, False otherwise
         """
-        # In Swag Labs app, successful login shows the PRODUCTS title
-        return self.is_element_present(self.PRODUCTS_TITLE, timeout=5)
+        # In Swag Labs app, successful login shows the PRODUCTS title, a failed one the error message.
+        # Waiting for both returns as soon as either outcome is on screen.
+        return self.wait_any([self.PRODUCTS_TITLE, self.ERROR_MESSAGE], timeout=5) == self.PRODUCTS_TITLE
     
     def is_login_page_displayed(self):
         """
@@ -95,6 +96,6 @@ class LoginPage(BasePage):
         Returns:
             str: Error message text or empty string if no error
         """
-        if self.is_element_present(self.ERROR_MESSAGE, timeout=3):
+        if self.wait_any([self.ERROR_MESSAGE, self.PRODUCTS_TITLE], timeout=3) == self.ERROR_MESSAGE:
             return self.get_text(self.ERROR_MESSAGE)
         return "" 
\ No newline at end of file
@@ -3,15 +3,67 @@
 Script to run tests in parallel on multiple Android devices
 """
 
+import argparse
 import sys
-from conftest import run_tests_in_parallel
+import pytest
+from conftest import get_device_ids
+from utils.logger import log
 
-if __name__ == "__main__":
-    # Get the test module from command line argument or use default
-    if len(sys.argv) > 1:
-        test_module = sys.argv[1]
+def run_tests_in_parallel(test_module, device_per_worker=False, dist="loadscope"):
+    """
+    Run tests in parallel on all available devices with pytest-xdist
+
+    A single pytest session is started with one worker per device. By default
+    every test runs on every device: tests are grouped by device_id
+    (--dist=loadgroup), so each worker drives exactly one device.
+
+    With device_per_worker each worker is pinned to one device and the tests
+    are spread over the workers instead. --dist=loadscope keeps the tests of
+    a class on one worker, so class-scoped fixtures such as logged_in_device
+    are set up once. --dist=loadfile keeps all tests of a module on one
+    worker, and so on one device.
+
+    Args:
+        test_module (str): Test module to run
+        device_per_worker (bool): Run every test once, spread across the devices
+        dist (str): xdist distribution mode with device_per_worker, "loadscope" or "loadfile"
+
+    Returns:
+        int: pytest exit code
+    """
+    device_ids = get_device_ids()
+    log.info(f"开始在 {len(device_ids)} 台设备上并行运行测试: {device_ids}")
+
+    if device_per_worker:
+        dist_args = [f"--dist={dist}", "--device-per-worker"]
     else:
-        test_module = "tests/test_login.py"
-        
-    print(f"Running tests in parallel on all configured devices: {test_module}")
-    run_tests_in_parallel(test_module) 
\ No newline at end of file
+        dist_args = ["--dist=loadgroup"]
+
+    # 测试结果边执行边写入 reports/results.json，结束时生成统一的HTML报告
+    exit_code = pytest.main([
+        test_module,
+        "-v",
+        # 每台设备一个worker，worker数多于设备数会让多个worker同时操作同一台设备
+        f"--numprocesses={len(device_ids)}",
+        *dist_args,
+        "--combined-report",
+        "--reruns=2",        # 失败重试2次
+        "--reruns-delay=1"   # 重试间隔1秒
+    ])
+
+    log.info(f"所有设备测试已完成，退出代码: {exit_code}")
+    return exit_code
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run tests in parallel on all configured devices")
+    parser.add_argument("test_module", nargs="?", default="tests/test_login.py",
+                        help="Test module to run (default: tests/test_login.py)")
+    parser.add_argument("--device-per-worker", action="store_true",
+                        help="Run every test once, spreading the tests across the devices")
+    parser.add_argument("--dist", choices=["loadscope", "loadfile"], default="loadscope",
+                        help="With --device-per-worker, keep the tests of a class (loadscope) "
+                             "or of a file (loadfile) on one device (default: loadscope)")
+    args = parser.parse_args()
+
+    print(f"Running tests in parallel on all configured devices: {args.test_module}")
+    sys.exit(run_tests_in_parallel(args.test_module, args.device_per_worker, args.dist))
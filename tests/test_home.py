@@ -0,0 +1,29 @@
+from pages.home_page import HomePage
+
+class TestHome:
+    """
+    Test class for the home page, sharing one login for all its tests
+    """
+    
+    def test_inventory_and_cart_displayed(self, logged_in_device):
+        """
+        Test that the product list and the shopping cart are shown on the home page
+        
+        Args:
+            logged_in_device: The logged in device fixture
+        """
+        home_page = HomePage(logged_in_device)
+        
+        assert home_page.is_element_present(HomePage.INVENTORY_LIST), "Product list is not displayed"
+        assert home_page.is_element_present(HomePage.SHOPPING_CART), "Shopping cart is not displayed"
+    
+    def test_products_title(self, logged_in_device):
+        """
+        Test the products title on the home page
+        
+        Args:
+            logged_in_device: The logged in device fixture
+        """
+        home_page = HomePage(logged_in_device)
+        
+        assert home_page.get_products_title() == "PRODUCTS", "Unexpected products title"
@@ -1,6 +1,8 @@
+import os
+import re
 import uiautomator2 as u2
-import time
 from utils.yaml_utils import get_device_config
+from utils.logger import log
 
 class DeviceManager:
     """
@@ -21,13 +23,18 @@ class DeviceManager:
         """
         Connect to the Android device
         
+        The connection is not verified with a device.info round trip, the
+        first real operation (start_app) fails if the device is unreachable.
+        Set UIA2_VERIFY_INFO=1 to check the uiautomator agent on connect.
+        
         Returns:
             uiautomator2.Device: Connected device object
         """
         try:
             self.device = u2.connect(self.serial)
-            # 简单检查设备是否连接成功
-            self.device.info
+            if os.environ.get("UIA2_VERIFY_INFO") == "1":
+                # 检查设备上的uiautomator服务是否可用
+                self.device.info
             print(f"Connected to device {self.serial}")
             return self.device
         except Exception as e:
@@ -43,25 +50,18 @@ class DeviceManager:
         app_package = self.device_config.get('app_package')
         app_activity = self.device_config.get('app_activity')
         
-        # Stop app if it's already running
-        # 使用shell命令检查应用是否在运行
-        try:
-            cmd = f"ps | grep {app_package}"
-            output = self.device.shell(cmd)
-            if app_package in output:
-                # 如果应用正在运行，则先停止
-                self.device.shell(f"am force-stop {app_package}")
-                time.sleep(1)
-        except Exception as e:
-            print(f"Warning: Failed to check app status: {e}")
-        
         # Start the app
         try:
-            # 使用shell命令启动应用
-            start_cmd = f"am start -n {app_package}/{app_activity}"
-            self.device.shell(start_cmd)
-            print(f"Started app {app_package} on device {self.serial}")
-            time.sleep(3)  # Wait for app to initialize
+            # 使用shell命令启动应用: -S 先强制停止已运行的应用，-W 等待Activity显示后再返回
+            start_cmd = f"am start -S -W -n {app_package}/{app_activity}"
+            response = self.device.shell(start_cmd, timeout=30)
+            output = response.output
+            # 启动失败时 (如 "Error: Activity class ... does not exist") 输出中没有 "Status: ok"
+            if response.exit_code != 0 or "Status: ok" not in output or "Error:" in output:
+                raise RuntimeError(output.strip() or f"am start exited with code {response.exit_code}")
+            match = re.search(r"TotalTime:\s*(\d+)", output)
+            launch_time = f" in {match.group(1)}ms" if match else ""
+            print(f"Started app {app_package} on device {self.serial}{launch_time}")
         except Exception as e:
             raise RuntimeError(f"Failed to start app {app_package}: {str(e)}")
     
@@ -78,7 +78,7 @@ class DeviceManager:
             self.device.shell(f"am force-stop {app_package}")
             print(f"Stopped app {app_package} on device {self.serial}")
         except Exception as e:
-            print(f"Warning: Failed to stop app {app_package}: {e}")
+            log.warning(f"Failed to stop app {app_package} on device {self.serial}: {e}")
     
     def disconnect(self):
         """
@@ -87,4 +87,4 @@ class DeviceManager:
         if self.device:
             # Only need to stop app as u2 doesn't require explicit disconnect
             self.stop_app()
-            self.device = None 
\ No newline at end of file
+            self.device = None
@@ -1,47 +1,94 @@
 import os
+import atexit
 import logging
+import logging.handlers
 import datetime
 
+# 日志格式中不使用线程和进程信息，关闭后每条日志记录不再采集这些字段
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
+
+class _LogFileHandler(logging.FileHandler):
+    """
+    文件日志处理器，在第一次写入日志文件时才创建日志目录
+    """
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
 class Logger:
     """
     日志工具类，用于记录测试执行过程中的日志信息
+    
+    单例: 每个进程只创建并配置一次
     """
+    _instance = None
+    
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._configured = False
+        return cls._instance
+    
     def __init__(self, log_level=logging.INFO):
         """
-        初始化日志工具
+        初始化日志工具，只有第一次调用时配置处理器，之后的调用直接返回
         
         Args:
             log_level: 日志级别，默认为INFO
         """
+        if self._configured:
+            return
+        self._configured = True
+        
         self.logger = logging.getLogger('AndroidTestFramework')
         self.logger.setLevel(log_level)
         
-        # 避免重复添加处理器
-        if not self.logger.handlers:
-            # 创建日志目录
-            log_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'logs')
-            os.makedirs(log_dir, exist_ok=True)
-            
-            # 生成日志文件名
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            log_file = os.path.join(log_dir, f'test_run_{timestamp}.log')
-            
-            # 添加文件处理器
-            file_handler = logging.FileHandler(log_file)
-            file_handler.setLevel(log_level)
-            
-            # 添加控制台处理器
-            console_handler = logging.StreamHandler()
-            console_handler.setLevel(log_level)
-            
-            # 设置日志格式
-            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-            file_handler.setFormatter(formatter)
-            console_handler.setFormatter(formatter)
+        # 设置日志格式
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+                                      datefmt='%Y-%m-%d %H:%M:%S')
+        
+        self.logger.addHandler(self._create_file_handler(log_level, formatter))
+        
+        # 添加控制台处理器
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(log_level)
+        console_handler.setFormatter(formatter)
+        self.logger.addHandler(console_handler)
+    
+    @staticmethod
+    def _create_file_handler(log_level, formatter):
+        """
+        创建带内存缓存的文件日志处理器
+        
+        Args:
+            log_level: 日志级别
+            formatter: 日志格式
             
-            # 添加处理器到logger
-            self.logger.addHandler(file_handler)
-            self.logger.addHandler(console_handler)
+        Returns:
+            logging.handlers.MemoryHandler: 包装文件处理器的缓存处理器
+        """
+        # 日志目录在第一次写入日志文件时创建
+        log_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'logs')
+        
+        # 生成日志文件名，pytest-xdist 的每个worker写入各自的日志文件 (test_run_<时间>_gw0.log)
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        worker_id = os.environ.get('PYTEST_XDIST_WORKER')
+        suffix = f'_{worker_id}' if worker_id and worker_id != 'master' else ''
+        log_file = os.path.join(log_dir, f'test_run_{timestamp}{suffix}.log')
+        
+        # 添加文件处理器，delay=True 直到第一次写入时才打开文件
+        file_handler = _LogFileHandler(log_file, delay=True)
+        file_handler.setLevel(log_level)
+        file_handler.setFormatter(formatter)
+        
+        # 文件日志先缓存在内存中批量写入，遇到ERROR及以上级别或缓存满时立即刷新
+        buffered_handler = logging.handlers.MemoryHandler(
+            capacity=1024, flushLevel=logging.ERROR, target=file_handler
+        )
+        atexit.register(buffered_handler.flush)
+        return buffered_handler
     
     def get_logger(self):
         """
@@ -98,4 +145,4 @@ class Logger:
         self.logger.critical(message)
 
 # 创建一个全局logger实例，方便直接使用
-log = Logger().get_logger() 
\ No newline at end of file
+log = Logger().get_logger()
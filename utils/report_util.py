@@ -0,0 +1,212 @@
+import os
+import re
+import json
+import datetime
+from utils.logger import log
+
+# 从nodeid中提取测试方法名的正则，预编译以便逐条用例复用
+# 参数部分 "[...]" 和 pytest-xdist loadgroup 追加的 "@group" 后缀不包含在方法名中
+_NODEID_RE = re.compile(r'::([^:\[@]+)(?:\[[^\]]*\])?(?:@[^:]*)?$')
+
+class ReportUtil:
+    """
+    测试报告工具类，在测试执行过程中逐条记录各设备的测试结果，并生成统一HTML报告
+    """
+    def __init__(self, test_module):
+        """
+        初始化报告工具，创建报告目录和结果文件
+        
+        Args:
+            test_module: 测试模块名称，显示在报告中
+        """
+        self.reports_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'reports')
+        os.makedirs(self.reports_dir, exist_ok=True)
+        
+        # 生成报告文件名
+        started_at = datetime.datetime.now()
+        timestamp = started_at.strftime("%Y%m%d_%H%M%S")
+        self.results_file = os.path.join(self.reports_dir, 'results.json')
+        self.report_file = os.path.join(self.reports_dir, f"combined_report_{timestamp}.html")
+        
+        self.data = {
+            'test_module': test_module,
+            'started_at': started_at.strftime("%Y-%m-%d %H:%M:%S"),
+            'tests': []
+        }
+        self._write_results()
+    
+    def add_result(self, nodeid, device_id, outcome, duration):
+        """
+        记录一条测试结果，并立即更新 results.json
+        
+        Args:
+            nodeid: 测试用例的nodeid
+            device_id: 执行该用例的设备ID
+            outcome: 测试结果 (passed/failed/skipped/error)
+            duration: 测试耗时(秒)
+        """
+        # Extract the test method name from the nodeid for better readability
+        # From format like "tests/test_login.py::TestLogin::test_successful_login[device1]@device1"
+        # to just "test_successful_login"
+        match = _NODEID_RE.search(nodeid)
+        if match:
+            name = match.group(1)
+        else:
+            name = nodeid.split('::')[-1] if '::' in nodeid else nodeid
+        
+        self.data['tests'].append({
+            'nodeid': nodeid,
+            'name': name,
+            'device_id': device_id,
+            'outcome': outcome,
+            'duration': duration
+        })
+        self._write_results()
+    
+    def _write_results(self):
+        """
+        原子地写入 results.json，读取方不会看到写了一半的文件
+        """
+        temp_file = f"{self.results_file}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False)
+        os.replace(temp_file, self.results_file)
+    
+    def generate_html_report(self):
+        """
+        根据已记录的测试结果生成包含所有设备的统一HTML报告
+        
+        Returns:
+            str: HTML报告文件路径
+        """
+        # 按设备分组测试结果
+        device_tests = {}
+        for test in self.data['tests']:
+            device_tests.setdefault(test['device_id'], []).append(test)
+        
+        # 创建HTML报告内容，各片段先收集到列表中，最后一次性拼接
+        parts = [f"""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="utf-8">
+            <title>多设备测试报告</title>
+            <style>
+                body {{
+                    font-family: Arial, sans-serif;
+                    margin: 20px;
+                    line-height: 1.6;
+                }}
+                h1 {{
+                    color: #333;
+                    border-bottom: 2px solid #eee;
+                    padding-bottom: 10px;
+                }}
+                .device-section {{
+                    margin-bottom: 30px;
+                    border: 1px solid #ddd;
+                    padding: 15px;
+                    border-radius: 5px;
+                }}
+                .device-header {{
+                    background-color: #f5f5f5;
+                    padding: 10px;
+                    margin: -15px -15px 15px -15px;
+                    border-bottom: 1px solid #ddd;
+                    border-radius: 5px 5px 0 0;
+                }}
+                .pass {{
+                    color: green;
+                }}
+                .fail {{
+                    color: red;
+                }}
+                .summary {{
+                    margin-bottom: 20px;
+                    font-size: 1.1em;
+                }}
+                table {{
+                    width: 100%;
+                    border-collapse: collapse;
+                }}
+                th, td {{
+                    border: 1px solid #ddd;
+                    padding: 8px;
+                    text-align: left;
+                }}
+                th {{
+                    background-color: #f2f2f2;
+                }}
+                tr:nth-child(even) {{
+                    background-color: #f9f9f9;
+                }}
+            </style>
+        </head>
+        <body>
+            <h1>Android UI 自动化测试报告</h1>
+            <div class="summary">
+                <p>测试模块: <strong>{self.data["test_module"]}</strong></p>
+                <p>执行时间: <strong>{self.data["started_at"]}</strong></p>
+                <p>测试设备数量: <strong>{len(device_tests)}</strong></p>
+            </div>
+        """]
+        
+        # 添加每个设备的测试结果
+        for device_id, tests in device_tests.items():
+            # 获取测试统计信息
+            total = len(tests)
+            passed = sum(1 for test in tests if test['outcome'] == 'passed')
+            failed = sum(1 for test in tests if test['outcome'] in ('failed', 'error'))
+            skipped = total - passed - failed
+            
+            # 添加设备测试结果到HTML
+            status_class = "pass" if failed == 0 else "fail"
+            
+            parts.append(f"""
+            <div class="device-section">
+                <div class="device-header">
+                    <h2>设备: {device_id}</h2>
+                    <p class="{status_class}">状态: {'通过' if failed == 0 else '失败'}</p>
+                </div>
+                <div class="device-summary">
+                    <p>总用例数: {total}</p>
+                    <p>通过: <span class="pass">{passed}</span></p>
+                    <p>失败: <span class="fail">{failed}</span></p>
+                    <p>跳过: {skipped}</p>
+                </div>
+                <table>
+                    <tr>
+                        <th>测试用例</th>
+                        <th>结果</th>
+                        <th>耗时 (秒)</th>
+                    </tr>
+            """)
+            
+            # 添加测试用例详情
+            for test in tests:
+                outcome = test['outcome']
+                outcome_class = "pass" if outcome == "passed" else "fail" if outcome in ("failed", "error") else ""
+                outcome_text = "通过" if outcome == "passed" else "失败" if outcome in ("failed", "error") else "跳过"
+                
+                parts.append(f"""
+                    <tr>
+                        <td>{test['name']}</td>
+                        <td class="{outcome_class}">{outcome_text}</td>
+                        <td>{test['duration']:.2f}</td>
+                    </tr>
+                """)
+            
+            parts.append("</table></div>")  # 结束设备部分
+        
+        # 完成HTML
+        parts.append("""
+        </body>
+        </html>
+        """)
+        
+        # 写入HTML文件
+        with open(self.report_file, 'w', encoding='utf-8') as f:
+            f.write("".join(parts))
+        
+        log.info(f"统一测试报告已生成: {self.report_file}")
+        return self.report_file
@@ -1,6 +1,7 @@
 import os
 import time
-import datetime
+import atexit
+from concurrent.futures import ThreadPoolExecutor
 from utils.logger import log
 
 class ScreenshotUtil:
@@ -9,45 +10,79 @@ class ScreenshotUtil:
     """
     def __init__(self):
         """
-        初始化截图工具，创建截图目录
+        初始化截图工具，截图目录在第一次截图时才创建
         """
-        # 创建截图目录
         self.screenshot_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'screenshots')
-        os.makedirs(self.screenshot_dir, exist_ok=True)
+        self._dir_created = False
+        
+        # 截图在后台线程中编码并写入磁盘，测试线程只需等待从设备获取图像
+        self._writer = ThreadPoolExecutor(max_workers=2, thread_name_prefix="screenshot")
+        # 进程退出前等待未完成的截图写入
+        atexit.register(self._writer.shutdown)
     
-    def take_screenshot(self, device, test_name=None):
+    def take_screenshot(self, device, test_name=None, wait=False):
         """
         捕获设备当前屏幕截图
         
         Args:
             device: uiautomator2 设备对象
             test_name: 测试名称，用于生成截图文件名
+            wait: 是否等待后台写入完成，用于需要引用截图文件的场景 (如HTML报告)
             
         Returns:
-            str: 截图文件的绝对路径
+            str: 截图文件的绝对路径，失败时返回None。
+                 wait为False时文件在后台写入，返回时可能尚未写完，写入失败时文件不存在
         """
         try:
-            # 生成截图文件名
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            # 创建截图目录，每个进程只需一次
+            if not self._dir_created:
+                os.makedirs(self.screenshot_dir, exist_ok=True)
+                self._dir_created = True
+            
+            # 生成截图文件名，纳秒时间戳无需格式化，同一秒内的多张截图也不会重名
+            timestamp = time.time_ns()
             device_id = device.serial
             
             if test_name:
                 # 替换特殊字符，避免文件名无效
-                test_name = test_name.replace('::', '_').replace('[', '_').replace(']', '_')
+                # nodeid 中的路径分隔符也要替换，否则截图会写入不存在的子目录
+                for char in ('::', '/', os.sep, '[', ']'):
+                    test_name = test_name.replace(char, '_')
                 screenshot_name = f"{test_name}_{device_id}_{timestamp}.png"
             else:
                 screenshot_name = f"screenshot_{device_id}_{timestamp}.png"
             
             screenshot_path = os.path.join(self.screenshot_dir, screenshot_name)
             
-            # 捕获截图
-            device.screenshot(screenshot_path)
-            log.info(f"截图已保存: {screenshot_path}")
+            # 捕获截图，编码和写入文件交给后台线程
+            image = device.screenshot()
+            future = self._writer.submit(self._save_screenshot, image, screenshot_path)
             
+            if wait and not future.result():
+                return None
             return screenshot_path
         except Exception as e:
             log.error(f"截图失败: {str(e)}")
             return None
+    
+    def _save_screenshot(self, image, screenshot_path):
+        """
+        将截图写入文件，在后台线程中执行
+        
+        Args:
+            image: 设备返回的截图 (PIL.Image)
+            screenshot_path: 截图文件路径
+            
+        Returns:
+            bool: 写入成功返回True
+        """
+        try:
+            image.save(screenshot_path)
+            log.info(f"截图已保存: {screenshot_path}")
+            return True
+        except Exception as e:
+            log.error(f"保存截图失败: {screenshot_path}, 错误: {str(e)}")
+            return False
 
 # 创建一个全局截图工具实例，方便直接使用
 screenshot_util = ScreenshotUtil() 
\ No newline at end of file
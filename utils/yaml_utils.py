@@ -1,21 +1,68 @@
 import os
+import functools
 import yaml
 
+try:
+    # orjson is optional, it only speeds up loading JSON config files
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+# Config file paths, resolved once at import
+_CFG_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config')
+_DEVICES = os.path.join(_CFG_DIR, 'devices.yaml')
+_CREDS = os.path.join(_CFG_DIR, 'credentials.yaml')
+
+# Use the libyaml based loader when PyYAML was built with it, it is much faster than the pure Python one
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+@functools.lru_cache(maxsize=None)
 def load_yaml(file_path):
     """
     Load data from a YAML file
     
+    The config files do not change during a test run, so each file is parsed
+    once per process and the same data is returned afterwards. Callers must
+    not modify the returned data.
+    
+    If a JSON file with the same name exists next to the YAML file (e.g.
+    devices.json for devices.yaml), it is loaded instead, which is faster.
+    
     Args:
         file_path (str): Path to the YAML file
         
     Returns:
         dict: The loaded YAML data
     """
+    json_path = os.path.splitext(file_path)[0] + '.json'
+    if os.path.exists(json_path):
+        with open(json_path, 'rb') as json_file:
+            return _json_loads(json_file.read())
+    
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"Could not find YAML file at {file_path}")
     
     with open(file_path, 'r') as yaml_file:
-        return yaml.safe_load(yaml_file)
+        return yaml.load(yaml_file, Loader=_YAML_LOADER)
+
+@functools.lru_cache(maxsize=None)
+def _devices_by_id():
+    """
+    Index the configured devices by their ID, built once per process
+    
+    Entries without an ID are skipped, and for duplicate IDs the first
+    entry wins, as with a linear scan of the devices list.
+    
+    Returns:
+        dict: Device configurations keyed by device ID, in config order
+    """
+    devices_data = load_yaml(_DEVICES)
+    devices = {}
+    for device in devices_data.get('devices', []):
+        device_id = device.get('id')
+        if device_id is not None:
+            devices.setdefault(device_id, device)
+    return devices
 
 def get_device_config(device_id):
     """
@@ -27,14 +74,11 @@ def get_device_config(device_id):
     Returns:
         dict: Device configuration
     """
-    devices_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config', 'devices.yaml')
-    devices_data = load_yaml(devices_path)
-    
-    for device in devices_data.get('devices', []):
-        if device.get('id') == device_id:
-            return device
-    
-    raise ValueError(f"No configuration found for device with ID {device_id}")
+    devices = _devices_by_id()
+    try:
+        return devices[device_id]
+    except KeyError:
+        raise ValueError(f"No configuration found for device with ID {device_id}") from None
 
 def get_account_credentials(account_type):
     """
@@ -46,8 +90,7 @@ def get_account_credentials(account_type):
     Returns:
         dict: Account credentials
     """
-    credentials_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config', 'credentials.yaml')
-    credentials_data = load_yaml(credentials_path)
+    credentials_data = load_yaml(_CREDS)
     
     account = credentials_data.get('accounts', {}).get(account_type)
     if not account: